@@ -1,9 +1,12 @@
-# fetch_build.py — versión simple (un solo host) + parche de caché "raw"
-import os, time, hmac, hashlib, pathlib, json
-from urllib.parse import urlencode
-import requests
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from collections import defaultdict
+# fetch_build.py — hosts de Binance en carrera + parche de caché "raw"
+import os, sys, time, hmac, hashlib, pathlib, math, asyncio
+import httpx
+import orjson
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import groupby
+from operator import attrgetter
 
 # === Config desde Secrets ===
 API_KEY       = os.getenv("BINANCE_API_KEY", "")
@@ -11,105 +14,282 @@ API_SECRET    = os.getenv("BINANCE_API_SECRET", "")
 REF_CODE      = os.getenv("BINANCE_REF_CODE", "")
 SITE_BASE_URL = (os.getenv("SITE_BASE_URL", "") or "").rstrip("/")
 BINANCE_BASE  = (os.getenv("BINANCE_BASE", "https://api.binance.com") or "").rstrip("/")
+# con el host por defecto también se prueban los alternativos oficiales (api1..api3)
+BINANCE_BASES = [BINANCE_BASE] + (
+    [f"https://api{i}.binance.com" for i in (1, 2, 3)]
+    if BINANCE_BASE == "https://api.binance.com" else []
+)
 
 # === Paths ===
 OUT_DIR       = pathlib.Path("site")
 TEMPLATES_DIR = pathlib.Path("templates")
 CACHE_PATH    = OUT_DIR / "data.json"
+STATE_DIR     = pathlib.Path(".build_cache")  # estado entre builds (no se publica; actions/cache)
+ETAG_PATH     = STATE_DIR / "data.etag"  # ETag del data.json de gh-pages que refleja CACHE_PATH
+DIGEST_PATH   = STATE_DIR / "site.digest"  # huella del último render publicado
+JINJA_CACHE   = pathlib.Path(".jinja_cache")  # bytecode de plantillas (persistido con actions/cache)
 HEADERS       = {"X-MBX-APIKEY": API_KEY}
+# HMAC con la clave ya cargada; cada firma parte de una copia
+_HMAC_TEMPLATE = hmac.new(API_SECRET.encode(), digestmod=hashlib.sha256) if API_SECRET else None
+
+# === HTTP ===
+# reintentos ante 429/5xx con backoff exponencial (los errores de conexión los reintenta el transporte)
+RETRY_STATUS  = {429, 500, 502, 503, 504}
+RETRY_TOTAL   = 3
+RETRY_BACKOFF = 0.3
+# auto-freno: fracción del límite de peso por minuto (cabeceras de Binance) a partir de la cual
+# se espera antes de la siguiente llamada
+WEIGHT_LIMITS   = {"x-sapi-used-ip-weight-1m": 12000, "x-mbx-used-weight-1m": 6000}
+WEIGHT_SOFT_PCT = 0.8
+WEIGHT_SLEEP    = 1.0
+# cliente compartido (keep-alive) para las lecturas de caché remotas
+HTTP = httpx.Client(follow_redirects=True, transport=httpx.HTTPTransport(retries=RETRY_TOTAL))
 
 # ---------- Util ----------
 def to_float(x):
+    # atajos por tipo exacto para los casos habituales (None, float, "" de Binance)
+    if x is None:
+        return None
+    t = type(x)
+    if t is float:
+        return x
+    if t is str and not x:
+        return None
     try:
         return float(x)
     except Exception:
         return None
 
-# ---------- Binance (UN SOLO HOST) ----------
-def signed_get(path: str, params: dict) -> dict:
-    if not API_KEY or not API_SECRET:
-        raise RuntimeError("Faltan BINANCE_API_KEY/SECRET en Secrets.")
+# ---------- Binance (host más rápido de BINANCE_BASES) ----------
+# host elegido en sync_time para el resto de la ejecución
+_BASE = BINANCE_BASE
+# desfase (ms) entre el reloj del servidor y el local; se mide una vez y sólo se refresca ante -1021
+_CLOCK_SKEW: int | None = None
+# mayor fracción de peso usada según la última respuesta
+_WEIGHT_USED = 0.0
+# ninguna llamada firmada sale antes de este instante (monotonic); lo fija un 429/418
+_PAUSE_UNTIL = 0.0
+# serializa las llamadas mientras el peso usado supera WEIGHT_SOFT_PCT
+_THROTTLE = asyncio.Lock()
 
-    # sincroniza tiempo (evita -1021)
+async def sync_time(client: httpx.AsyncClient):
+    # carrera de /api/v3/time entre todos los hosts: el primero que responde bien fija el
+    # desfase y el host de las llamadas firmadas; el resto se cancela
+    global _CLOCK_SKEW, _BASE
+
+    async def probe(base):
+        r = await client.get(f"{base}/api/v3/time", timeout=2)
+        return base, orjson.loads(r.content)["serverTime"]
+
+    pending = {asyncio.create_task(probe(b)) for b in BINANCE_BASES}
+    for t in pending:
+        # recoge el error de cada sonda perdedora (evita "Task exception was never retrieved")
+        t.add_done_callback(lambda t: t.cancelled() or t.exception())
     try:
-        t = requests.get(f"{BINANCE_BASE}/api/v3/time", timeout=10).json()["serverTime"]
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    _BASE, server_t = t.result()
+                    _CLOCK_SKEW = server_t - int(time.time() * 1000)
+                    return
+    finally:
+        for t in pending:
+            t.cancel()
+    _CLOCK_SKEW = 0
+
+def track_weight(r: httpx.Response):
+    global _WEIGHT_USED
+    used = [int(r.headers[h]) / lim for h, lim in WEIGHT_LIMITS.items() if r.headers.get(h, "").isdigit()]
+    if used:
+        _WEIGHT_USED = max(used)
+
+def pause_requests(r: httpx.Response, attempt: int):
+    # Binance pide esperar (Retry-After) y seguir llamando acaba en ban de IP (418):
+    # la pausa vale para todas las llamadas en curso, no sólo para ésta
+    global _PAUSE_UNTIL
+    try:
+        wait = float(r.headers["Retry-After"])
+    except (KeyError, ValueError):
+        wait = RETRY_BACKOFF * 2 ** attempt
+    _PAUSE_UNTIL = max(_PAUSE_UNTIL, time.monotonic() + wait)
+
+def binance_error_code(r: httpx.Response):
+    try:
+        return orjson.loads(r.content).get("code")
     except Exception:
-        t = int(time.time() * 1000)
+        return None
+
+async def signed_get(client: httpx.AsyncClient, sem: asyncio.Semaphore, responses: dict, path: str, params: dict) -> dict:
+    if not API_KEY or not API_SECRET:
+        raise RuntimeError("Faltan BINANCE_API_KEY/SECRET en Secrets.")
+
+    key = (path, tuple(sorted((params or {}).items())))
+    if key in responses:
+        return responses[key]
+    if _CLOCK_SKEW is None:
+        await sync_time(client)
 
-    p = dict(params or {})
-    p.setdefault("recvWindow", 5000)
-    p["timestamp"] = t
+    async def send():
+        p = dict(params or {})
+        p.setdefault("recvWindow", 5000)
+        p["timestamp"] = int(time.time() * 1000) + _CLOCK_SKEW
 
-    q = urlencode(p, doseq=True)
-    sig = hmac.new(API_SECRET.encode(), q.encode(), hashlib.sha256).hexdigest()
-    url = f"{BINANCE_BASE}{path}?{q}&signature={sig}"
+        # todos los valores son escalares simples (números), no hace falta urlencode
+        q = "&".join(f"{k}={v}" for k, v in p.items())
+        h = _HMAC_TEMPLATE.copy()
+        h.update(q.encode())
+        sig = h.hexdigest()
+        r = await client.get(f"{_BASE}{path}?{q}&signature={sig}", timeout=8)
+        track_weight(r)
+        return r
 
-    r = requests.get(url, headers=HEADERS, timeout=25)
+    attempt, resynced = 0, False
+    while True:
+        async with sem:
+            delay = _PAUSE_UNTIL - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if _WEIGHT_USED > WEIGHT_SOFT_PCT:
+                # cerca del límite de peso: las llamadas salen de a una, con pausa, y cada una
+                # vuelve a mirar el peso que dejó la respuesta anterior antes de enviar
+                async with _THROTTLE:
+                    if _WEIGHT_USED > WEIGHT_SOFT_PCT:
+                        await asyncio.sleep(WEIGHT_SLEEP)
+                    r = await send()
+            else:
+                r = await send()
+        if r.status_code == 400 and not resynced and binance_error_code(r) == -1021:
+            # reloj desfasado fuera de recvWindow: vuelve a medir y reintenta una vez
+            resynced = True
+            await sync_time(client)
+            continue
+        if r.status_code in (418, 429):
+            pause_requests(r, attempt)
+        # 418 (IP baneada) no está en RETRY_STATUS: se corta y se propaga el error
+        if r.status_code not in RETRY_STATUS or attempt == RETRY_TOTAL:
+            break
+        if r.status_code != 429:  # el 429 ya espera vía _PAUSE_UNTIL
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        attempt += 1
     if r.status_code != 200:
         # deja rastro en logs para diagnosticar
         print("Binance error:", r.status_code, r.text[:200])
         r.raise_for_status()
-    return r.json()
-
-def fetch_all_rows(path: str, page_size=100, max_pages=50):
-    rows = []
-    for current in range(1, max_pages + 1):
-        data = signed_get(path, {"size": page_size, "current": current})
-        part = data.get("rows", []) or []
-        rows.extend(part)
-        total = data.get("total", 0)
-        if len(rows) >= total or not part:
-            break
-        time.sleep(0.2)
+    data = responses[key] = orjson.loads(r.content)
+    return data
+
+async def fetch_all_rows(client: httpx.AsyncClient, sem: asyncio.Semaphore, responses: dict, path: str, page_size=100, max_pages=50):
+    # página 1 → "total" → resto de páginas en paralelo (el semáforo limita la concurrencia)
+    first = await signed_get(client, sem, responses, path, {"size": page_size, "current": 1})
+    rows = list(first.get("rows", []) or [])
+    total = first.get("total", 0) or 0
+    pages = min(max_pages, math.ceil(total / page_size))
+    rest = await asyncio.gather(*[
+        signed_get(client, sem, responses, path, {"size": page_size, "current": i})
+        for i in range(2, pages + 1)
+    ])
+    for data in rest:
+        rows.extend(data.get("rows", []) or [])
     return rows
 
+async def _amain():
+    transport = httpx.AsyncHTTPTransport(
+        http2=True, limits=httpx.Limits(max_connections=16), retries=RETRY_TOTAL
+    )
+    async with httpx.AsyncClient(headers=HEADERS, transport=transport) as client:
+        await sync_time(client)
+        sem = asyncio.Semaphore(8)
+        # respuestas ya obtenidas en este build, por (path, params sin timestamp/firma)
+        responses = {}
+        return await asyncio.gather(
+            fetch_all_rows(client, sem, responses, "/sapi/v1/simple-earn/flexible/list"),
+            fetch_all_rows(client, sem, responses, "/sapi/v1/simple-earn/locked/list"),
+        )
+
+# ---------- Modelo ----------
+# cadenas constantes internadas: todos los productos comparten el mismo objeto
+_BINANCE  = sys.intern("Binance")
+_FLEXIBLE = sys.intern("Flexible")
+_LOCKED   = sys.intern("Locked")
+
+@dataclass(slots=True)
+class Product:
+    exchange: str
+    type: str
+    asset: str
+    apr: float
+    duration_days: int | None
+    min_purchase: str | None
+    sold_out: bool | None
+    can_purchase: bool | None
+    product_id: str | None
+
 # ---------- Normalización y render ----------
+def asset_sort_key(x):
+    # por activo y, dentro de cada activo: Locked primero, luego mayor APR, luego plazo más corto
+    return (x.asset, x.type != _LOCKED, -(x.apr or 0), x.duration_days or 0)
+
 def normalize_products(flex_rows, lock_rows):
+    # una sola pasada: descarta filas sin activo/APR al construir cada producto
     items = []
     for r in (flex_rows or []):
-        items.append({
-            "exchange": "Binance",
-            "type": "Flexible",
-            "asset": r.get("asset"),
-            "apr": to_float(r.get("latestAnnualPercentageRate")),
-            "duration_days": None,
-            "min_purchase": r.get("minPurchaseAmount"),
-            "sold_out": r.get("isSoldOut"),
-            "can_purchase": r.get("canPurchase"),
-            "product_id": r.get("productId"),
-        })
+        asset = r.get("asset")
+        apr = to_float(r.get("latestAnnualPercentageRate"))
+        if not asset or apr is None:
+            continue
+        asset = sys.intern(asset)
+        it = Product(
+            exchange=_BINANCE,
+            type=_FLEXIBLE,
+            asset=asset,
+            apr=apr,
+            duration_days=None,
+            min_purchase=r.get("minPurchaseAmount"),
+            sold_out=r.get("isSoldOut"),
+            can_purchase=r.get("canPurchase"),
+            product_id=r.get("productId"),
+        )
+        items.append(it)
     for r in (lock_rows or []):
         d = r.get("detail", {}) or {}
+        asset = d.get("asset")
+        apr = to_float(d.get("apr"))
+        if not asset or apr is None:
+            continue
+        asset = sys.intern(asset)
         q = r.get("quota", {}) or {}
-        items.append({
-            "exchange": "Binance",
-            "type": "Locked",
-            "asset": d.get("asset"),
-            "apr": to_float(d.get("apr")),
-            "duration_days": d.get("duration"),
-            "min_purchase": q.get("minimum"),
-            "sold_out": d.get("isSoldOut"),
-            "can_purchase": not d.get("isSoldOut"),
-            "product_id": r.get("projectId"),
-        })
-
-    items = [it for it in items if it.get("asset") and it.get("apr") is not None]
-    items.sort(key=lambda x: (x["apr"] or 0.0), reverse=True)
-    return items
+        it = Product(
+            exchange=_BINANCE,
+            type=_LOCKED,
+            asset=asset,
+            apr=apr,
+            duration_days=d.get("duration"),
+            min_purchase=q.get("minimum"),
+            sold_out=d.get("isSoldOut"),
+            can_purchase=not d.get("isSoldOut"),
+            product_id=r.get("projectId"),
+        )
+        items.append(it)
+
+    items.sort(key=attrgetter("apr"), reverse=True)
+    return items, group_by_asset(items)
 
 def group_by_asset(items):
-    g = defaultdict(list)
-    for it in items:
-        g[it["asset"]].append(it)
-    for k in g:
-        g[k].sort(key=lambda x: (x["type"] != "Locked", -(x["apr"] or 0), x.get("duration_days") or 0))
-    return g
-
-def render_site(items, by_asset, note=None):
+    # un solo sort por (activo, criterio interno) + groupby, sin ordenar cada grupo aparte;
+    # los activos quedan en el orden de aparición en items (mejor APR primero)
+    groups = {a: list(g) for a, g in groupby(sorted(items, key=asset_sort_key), key=attrgetter("asset"))}
+    return {a: groups[a] for a in dict.fromkeys(it.asset for it in items)}
+
+def render_site(by_asset, note=None):
     OUT_DIR.mkdir(parents=True, exist_ok=True)
+    JINJA_CACHE.mkdir(parents=True, exist_ok=True)
     env = Environment(
         loader=FileSystemLoader(str(TEMPLATES_DIR)),
-        autoescape=select_autoescape(["html", "xml"])
+        autoescape=select_autoescape(["html", "xml"]),
+        auto_reload=False,
+        cache_size=400,
+        bytecode_cache=FileSystemBytecodeCache(directory=str(JINJA_CACHE)),
     )
     ctx = {
         "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
@@ -119,26 +299,34 @@ def render_site(items, by_asset, note=None):
     }
 
     # index
-    html = env.get_template("index.html").render(items=items, by_asset=by_asset, **ctx)
-    (OUT_DIR / "index.html").write_text(html, encoding="utf-8")
+    # la tabla del index se pinta en el cliente a partir del mejor producto de cada activo;
+    # "<" se escapa para que el JSON no pueda cerrar el <script> que lo contiene
+    items_json = orjson.dumps([lst[0] for lst in by_asset.values()]).replace(b"<", b"\\u003c").decode()
+    html = env.get_template("index.html").render(items_json=items_json, **ctx)
+    (OUT_DIR / "index.html").write_bytes(html.encode("utf-8"))
 
-    # páginas por activo
+    # páginas por activo (en paralelo; ctx no se modifica, no hace falta lock)
     tmpl = env.get_template("asset.html")
-    for asset, lst in by_asset.items():
+
+    def render_one(asset, lst):
         html = tmpl.render(asset=asset, items=lst, **ctx)
-        (OUT_DIR / f"{asset}.html").write_text(html, encoding="utf-8")
+        (OUT_DIR / f"{asset}.html").write_bytes(html.encode("utf-8"))
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(render_one, by_asset.keys(), by_asset.values()))
 
     # sitemap
     if SITE_BASE_URL:
-        urls = [f"{SITE_BASE_URL}/", *[f"{SITE_BASE_URL}/{a}.html" for a in by_asset.keys()]]
-        sm = [
-            "<?xml version='1.0' encoding='UTF-8'?>",
-            "<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>",
-        ]
-        for u in urls:
-            sm.append(f"<url><loc>{u}</loc></url>")
-        sm.append("</urlset>")
-        (OUT_DIR / "sitemap.xml").write_text("\n".join(sm), encoding="utf-8")
+        base = SITE_BASE_URL.encode("utf-8")
+        sm = bytearray(
+            b"<?xml version='1.0' encoding='UTF-8'?>\n"
+            b"<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>\n"
+        )
+        sm += b"<url><loc>" + base + b"/</loc></url>\n"
+        for a in by_asset.keys():
+            sm += b"<url><loc>" + base + b"/" + a.encode("utf-8") + b".html</loc></url>\n"
+        sm += b"</urlset>"
+        (OUT_DIR / "sitemap.xml").write_bytes(sm)
 
 def write_robots():
     txt = (
@@ -148,10 +336,40 @@ def write_robots():
     )
     (OUT_DIR / "robots.txt").write_text(txt, encoding="utf-8")
 
+def build_digest(items, note):
+    # huella de todo lo que determina lo publicado: datos, aviso, config, plantillas y este
+    # mismo script (render_site, sitemap, robots), para que un cambio de código se despliegue
+    h = hashlib.blake2b(digest_size=16)
+    h.update(orjson.dumps([items, note, REF_CODE, SITE_BASE_URL], option=orjson.OPT_SORT_KEYS))
+    h.update(pathlib.Path(__file__).read_bytes())
+    for p in sorted(TEMPLATES_DIR.glob("*.html")):
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+def set_output(name, value):
+    # salida del paso para el workflow de GitHub Actions (no hace nada fuera de Actions)
+    path = os.getenv("GITHUB_OUTPUT")
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"{name}={value}\n")
+
 def save_cache(items):
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    with open(CACHE_PATH, "w", encoding="utf-8") as f:
-        json.dump(items, f)
+    # JSON Lines: un ítem por línea (se puede leer/filtrar línea a línea)
+    with open(CACHE_PATH, "wb") as f:
+        f.writelines(orjson.dumps(it, option=orjson.OPT_APPEND_NEWLINE) for it in items)
+
+def parse_cache(buf: bytes):
+    # data.json antiguo es un array JSON ("[" al inicio); el nuevo, JSON Lines
+    buf = buf.lstrip()
+    if not buf:
+        # vacío no es "sin ítems": se trata como caché inválida para pasar a la siguiente fuente
+        raise ValueError("data.json vacío")
+    if buf[:1] == b"[":
+        rows = orjson.loads(buf)
+    else:
+        rows = [orjson.loads(line) for line in buf.splitlines() if line.strip()]
+    return [Product(**it) for it in rows]
 
 def load_cache():
     """
@@ -167,26 +385,48 @@ def load_cache():
         try:
             owner, repo = slug.split("/", 1)
             raw_url = f"https://raw.githubusercontent.com/{owner}/{repo}/gh-pages/data.json"
-            r = requests.get(raw_url, timeout=12)
-            if r.status_code == 200 and r.text.strip():
-                return r.json(), "raw"
+            # GET condicional: si no cambió (304) se usa la copia local sin descargar nada
+            headers = {}
+            if ETAG_PATH.exists() and CACHE_PATH.exists():
+                headers["If-None-Match"] = ETAG_PATH.read_text(encoding="utf-8").strip()
+            # descarga a un .part aparte (en STATE_DIR, fuera de lo publicado): CACHE_PATH (la
+            # copia local buena) sólo se reemplaza si el JSON descargado es válido, así una
+            # descarga cortada no lo pisa; el .part se borra pase lo que pase
+            part = STATE_DIR / (CACHE_PATH.name + ".part")
+            try:
+                with HTTP.stream("GET", raw_url, headers=headers, timeout=12) as r:
+                    if r.status_code == 304:
+                        return parse_cache(CACHE_PATH.read_bytes()), "raw"
+                    if r.status_code == 200:
+                        STATE_DIR.mkdir(parents=True, exist_ok=True)
+                        with open(part, "wb") as f:
+                            for chunk in r.iter_bytes():
+                                f.write(chunk)
+                if r.status_code == 200:
+                    items = parse_cache(part.read_bytes())
+                    OUT_DIR.mkdir(parents=True, exist_ok=True)
+                    part.replace(CACHE_PATH)
+                    if r.headers.get("ETag"):
+                        ETAG_PATH.write_text(r.headers["ETag"], encoding="utf-8")
+                    return items, "raw"
+            finally:
+                part.unlink(missing_ok=True)
         except Exception:
             pass
 
     # 1) caché local del build anterior → fuente "local"
     if CACHE_PATH.exists():
         try:
-            with open(CACHE_PATH, "r", encoding="utf-8") as f:
-                return json.load(f), "local"
+            return parse_cache(CACHE_PATH.read_bytes()), "local"
         except Exception:
             pass
 
     # 2) como respaldo, desde el sitio público → fuente "site"
     try:
         if SITE_BASE_URL:
-            r = requests.get(f"{SITE_BASE_URL}/data.json", timeout=10)
+            r = HTTP.get(f"{SITE_BASE_URL}/data.json", timeout=10)
             if r.status_code == 200 and r.text.strip():
-                return r.json(), "site"
+                return parse_cache(r.content), "site"
     except Exception:
         pass
 
@@ -195,9 +435,8 @@ def load_cache():
 def main():
     note = None
     try:
-        flex = fetch_all_rows("/sapi/v1/simple-earn/flexible/list")
-        lock = fetch_all_rows("/sapi/v1/simple-earn/locked/list")
-        items = normalize_products(flex, lock)
+        flex, lock = asyncio.run(_amain())
+        items, by_asset = normalize_products(flex, lock)
         if items:
             save_cache(items)
         else:
@@ -207,6 +446,7 @@ def main():
         cached, src = load_cache()
         if cached:
             items = cached
+            by_asset = group_by_asset(items)
             # Si viene del branch gh-pages (raw), NO mostrar aviso
             note = None if src == "raw" else "Mostrando datos en caché por un problema temporal con la API."
         else:
@@ -217,12 +457,23 @@ def main():
                 encoding="utf-8"
             )
             write_robots()
+            DIGEST_PATH.unlink(missing_ok=True)
             return
 
-    by_asset = group_by_asset(items)
-    render_site(items, by_asset, note=note)
+    # mismos datos que el último render publicado → no se regenera nada; en Actions site/
+    # llega vacío, pero el workflow tampoco despliega (changed=false) y gh-pages se conserva
+    digest = build_digest(items, note)
+    if DIGEST_PATH.exists() and DIGEST_PATH.read_text(encoding="utf-8") == digest \
+            and ((OUT_DIR / "index.html").exists() or os.getenv("GITHUB_OUTPUT")):
+        print("Sin cambios, se omite el render.")
+        set_output("changed", "false")
+        return
+
+    render_site(by_asset, note=note)
     write_robots()
     save_cache(items)
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    DIGEST_PATH.write_text(digest, encoding="utf-8")
     print(f"OK. Publicado con {len(items)} items. Nota: {note or '—'}")
 
 if __name__ == "__main__":